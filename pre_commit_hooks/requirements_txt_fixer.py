@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import io
 import re
 from typing import IO
 from typing import Sequence
@@ -9,30 +10,67 @@ from typing import Sequence
 PASS = 0
 FAIL = 1
 
+# large enough to read and write typical requirements files in one syscall
+BUFFER_SIZE = 1 << 17
+
+UNTIL_COMPARISON_SEARCH = re.compile(b'={2,3}|!=|~=|>=?|<=?').search
+VERSION_MATCHER_SEARCH = re.compile(br'(?:={2,3}|!=|~=|>=?|<=?|@)\s*(?P<version>[A-Za-z0-9./:]+)$').search  # noqa: E501
+WHITESPACE = frozenset(b' \t\n\r\x0b\x0c')
+COMMENT = ord('#')
+# value of the requirement standing in for the top of file comment
+TOP_OF_FILE = b'\n'
+# automatically added by broken pip package under Debian
+PKG_RESOURCES = b'pkg-resources==0.0.0\n'
+SEPARATORS = (b';', b' ', b'\t', b'\n', b'\r', b'\x0b', b'\x0c')
+
 
 class Requirement:
-    UNTIL_COMPARISON = re.compile(b'={2,3}|!=|~=|>=?|<=?')
-    VERSION_MATCHER = re.compile(br'(?:={2,3}|!=|~=|>=?|<=?|@)\s*(?P<version>[A-Za-z0-9./:]+)$')  # noqa: E501
-    UNTIL_SEP = re.compile(rb'[^;\s]+')
+    __slots__ = ('_parts', '_value', 'version', 'comments', '_name')
 
     def __init__(self) -> None:
-        self.value: bytes | None = None
+        # continuation lines are collected and joined once on first read
+        self._parts: list[bytes] = []
+        self._value: bytes | None = None
         self.version: str | None = None
         self.comments: list[bytes] = []
+        self._name: bytes | None = None
+
+    @property
+    def value(self) -> bytes | None:
+        if self._value is None and self._parts:
+            self._value = b''.join(self._parts)
+        return self._value
+
+    @value.setter
+    def value(self, value: bytes | None) -> None:
+        self._parts = [] if value is None else [value]
+        self._value = value
+        self._name = None
 
     @property
     def name(self) -> bytes:
+        # computed once: sorting accesses the name on every comparison
+        if self._name is None:
+            self._name = self._compute_name()
+        return self._name
+
+    def _compute_name(self) -> bytes:
         assert self.value is not None, self.value
         name = self.value.lower()
         for egg in (b'#egg=', b'&egg='):
             if egg in self.value:
                 return name.partition(egg)[-1]
 
-        m = self.UNTIL_SEP.match(name)
-        assert m is not None
+        # indented requirements sort by the requirement itself
+        name = name.lstrip()
+        end = len(name)
+        for sep in SEPARATORS:
+            i = name.find(sep, 0, end)
+            if i != -1:
+                end = i
+        name = name[:end]
 
-        name = m.group()
-        m = self.UNTIL_COMPARISON.search(name)
+        m = UNTIL_COMPARISON_SEARCH(name)
         if not m:
             return name
 
@@ -45,12 +83,12 @@ class Requirement:
         """Ignore version requirement if the line is -r <some_req_file.txt>"""
         if not self.value:
             return False
-        return self.value.decode().startswith('-r')
+        return self.value.startswith(b'-r')
 
     def extract_version(self) -> str | None:
         if not self.value:
             return None
-        matches = self.VERSION_MATCHER.search(self.value)
+        matches = VERSION_MATCHER_SEARCH(self.value)
         if matches:
             self.version = matches.groups()[0].decode()
         else:
@@ -58,65 +96,106 @@ class Requirement:
         return self.version
 
     def __lt__(self, requirement: Requirement) -> bool:
-        # \n means top of file comment, so always return True,
-        # otherwise just do a string comparison with value.
-        assert self.value is not None, self.value
-        if self.value == b'\n':
-            return True
-        elif requirement.value == b'\n':
-            return False
-        else:
-            return self.name < requirement.name
+        return _sort_key(self) < _sort_key(requirement)
+
+    def has_value(self) -> bool:
+        # unlike checking value, this does not join the parts
+        return bool(self._parts)
 
     def is_complete(self, require_version: bool = False) -> bool:
         return (
-            self.value is not None and
-            not self.value.rstrip(b'\r\n').endswith(b'\\')
+            bool(self._parts) and
+            not self._parts[-1].rstrip(b'\r\n').endswith(b'\\')
         )
 
     def append_value(self, value: bytes) -> None:
-        if self.value is not None:
-            self.value += value
-        else:
-            self.value = value
+        self._parts.append(value)
+        self._value = None
+        self._name = None
 
 
-def fix_requirements(f: IO[bytes], require_version: bool = False) -> int:
-    requirements: list[Requirement] = []
-    before = list(f)
-    after: list[bytes] = []
+def _first_non_whitespace(line: bytes) -> int | None:
+    for c in line:
+        if c not in WHITESPACE:
+            return c
+    return None
 
-    before_string = b''.join(before)
+
+def _sort_key(requirement: Requirement) -> tuple[int, bytes]:
+    # the top of file comment always sorts first,
+    # otherwise just do a string comparison with the name.
+    assert requirement.value is not None, requirement.value
+    if requirement.value == TOP_OF_FILE:
+        return (0, b'')
+    else:
+        return (1, requirement.name)
+
+
+def fix_requirements_contents(
+        contents: bytes,
+        require_version: bool = False,
+) -> tuple[int, bytes]:
+    # split on b'\n' only, the same way iterating the file would
+    before = io.BytesIO(contents).readlines()
+    # set when parsing alone alters the contents, in which case the file
+    # must be rewritten even if it is already sorted
+    changed = False
 
     # adds new line in case one is missing
     # AND a change to the requirements file is needed regardless:
     if before and not before[-1].endswith(b'\n'):
         before[-1] += b'\n'
+        changed = True
 
     # If the file is empty (i.e. only whitespace/newlines) exit early
-    if before_string.strip() == b'':
-        return PASS
-
-    for line in before:
-        # If the most recent requirement object has a value, then it's
-        # time to start building the next requirement object.
+    if contents.strip() == b'':
+        return PASS, contents
 
-        if not len(requirements) or requirements[-1].is_complete():
-            requirements.append(Requirement())
+    lines = iter(before)
+    requirement = Requirement()
+    requirements = [requirement]
 
-        requirement = requirements[-1]
+    # Lines up to the end of the first requirement may form a top of
+    # file comment, handle them separately to keep the main loop tight.
+    for line in lines:
+        first = _first_non_whitespace(line)
 
         # If we see a newline before any requirements, then this is a
         # top of file comment.
-        if len(requirements) == 1 and line.strip() == b'':
+        if first is None:
             if (
                     len(requirement.comments) and
                     requirement.comments[0].startswith(b'#')
             ):
-                requirement.value = b'\n'
+                changed |= requirement.has_value() or line != b'\n'
+                requirement.value = TOP_OF_FILE
             else:
+                changed |= requirement.has_value()
                 requirement.comments.append(line)
-        elif line.lstrip().startswith(b'#') or line.strip() == b'':
+        elif first == COMMENT:
+            changed |= requirement.has_value()
+            requirement.comments.append(line)
+        else:
+            requirement.append_value(line)
+
+        if requirement.is_complete():
+            break
+
+    for line in lines:
+        # If the most recent requirement object has a value, then it's
+        # time to start building the next requirement object.
+        if requirement.is_complete():
+            # find and remove pkg-resources==0.0.0
+            if requirement.value == PKG_RESOURCES:
+                requirements.pop()
+                changed = True
+            requirement = Requirement()
+            requirements.append(requirement)
+
+        first = _first_non_whitespace(line)
+        if first is None or first == COMMENT:
+            # a comment inside a continuation is moved above the value
+            changed |= requirement.has_value()
             requirement.comments.append(line)
         else:
             requirement.append_value(line)
@@ -126,26 +205,26 @@ def fix_requirements(f: IO[bytes], require_version: bool = False) -> int:
         rest = requirements.pop().comments
     else:
         rest = []
+        if requirements[-1].value == PKG_RESOURCES:
+            requirements.pop()
+            changed = True
 
-    # find and remove pkg-resources==0.0.0
-    # which is automatically added by broken pip package under Debian
-    requirements = [
-        req for req in requirements
-        if req.value != b'pkg-resources==0.0.0\n'
-    ]
+    # zero or one requirement (the common generated file) needs no sorting
+    if len(requirements) <= 1:
+        already_sorted = True
+    else:
+        keys = [_sort_key(req) for req in requirements]
+        already_sorted = all(a <= b for a, b in zip(keys, keys[1:]))
+        if not already_sorted:
+            requirements.sort(key=_sort_key)
 
     missing_versions = []
-    for requirement in sorted(requirements):
-        after.extend(requirement.comments)
+    for requirement in requirements:
         assert requirement.value, requirement.value
-        after.append(requirement.value)
         if require_version and \
                 not requirement.is_include() and \
                 not requirement.has_version():
             missing_versions.append(requirement.value.decode().strip())
-    after.extend(rest)
-
-    after_string = b''.join(after)
 
     # If the version is required but missing, we return FAIL,
     # but still write the fixes to the file, because the pip install
@@ -158,11 +237,30 @@ def fix_requirements(f: IO[bytes], require_version: bool = False) -> int:
         print('Missing versions in:', ', '.join(missing_versions))
         outcome = FAIL
 
-    if before_string != after_string:
+    # the file would be written back unchanged, skip rebuilding it
+    if already_sorted and not changed:
+        return outcome, contents
+
+    after = bytearray()
+    for requirement in requirements:
+        for comment in requirement.comments:
+            after += comment
+        assert requirement.value, requirement.value
+        after += requirement.value
+    for comment in rest:
+        after += comment
+
+    return FAIL, bytes(after)
+
+
+def fix_requirements(f: IO[bytes], require_version: bool = False) -> int:
+    before = f.read()
+    outcome, after = fix_requirements_contents(before, require_version)
+
+    if after != before:
         f.seek(0)
-        f.write(after_string)
-        f.truncate()
-        outcome = FAIL
+        f.truncate(len(after))
+        f.write(after)
 
     return outcome
 
@@ -182,7 +280,7 @@ def main(argv: Sequence[str] | None = None) -> int:
     retv = PASS
 
     for arg in args.filenames:
-        with open(arg, 'rb+') as file_obj:
+        with open(arg, 'rb+', buffering=BUFFER_SIZE) as file_obj:
             ret_for_file = fix_requirements(file_obj, args.require_version)
 
             if ret_for_file:
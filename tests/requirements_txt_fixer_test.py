@@ -4,6 +4,7 @@ import _pytest
 import pytest
 
 from pre_commit_hooks.requirements_txt_fixer import FAIL
+from pre_commit_hooks.requirements_txt_fixer import fix_requirements_contents
 from pre_commit_hooks.requirements_txt_fixer import main
 from pre_commit_hooks.requirements_txt_fixer import PASS
 from pre_commit_hooks.requirements_txt_fixer import Requirement
@@ -16,9 +17,16 @@ from pre_commit_hooks.requirements_txt_fixer import Requirement
         (b'\n', PASS, b'\n'),
         (b'# intentionally empty\n', PASS, b'# intentionally empty\n'),
         (b'foo\n# comment at end\n', PASS, b'foo\n# comment at end\n'),
+        (b'b\na\n# comment at end\n', FAIL, b'a\nb\n# comment at end\n'),
+        (b'foo', FAIL, b'foo\n'),
+        (b'# comment\n\nfoo\n', PASS, b'# comment\n\nfoo\n'),
+        (b'pkg-resources==0.0.0\nfoo\n', FAIL, b'foo\n'),
         (b'foo\nbar\n', FAIL, b'bar\nfoo\n'),
         (b'bar\nfoo\n', PASS, b'bar\nfoo\n'),
+        (b'  foo\nbar\n', FAIL, b'bar\n  foo\n'),
+        (b'bar\r\n  foo\n', PASS, b'bar\r\n  foo\n'),
         (b'a\nc\nb\n', FAIL, b'a\nb\nc\n'),
+        (b'b\ra\na\n', FAIL, b'a\nb\ra\n'),
         (b'a\nc\nb', FAIL, b'a\nb\nc\n'),
         (b'a\nb\nc', FAIL, b'a\nb\nc\n'),
         (
@@ -43,6 +51,7 @@ from pre_commit_hooks.requirements_txt_fixer import Requirement
             PASS,
             b'bar\n\t#comment with indent\nfoo\n',
         ),
+        (b'#comment\r\n\r\nfoo\r\n', FAIL, b'#comment\r\n\nfoo\r\n'),
         (b'\nfoo\nbar\n', FAIL, b'bar\n\nfoo\n'),
         (b'\nbar\nfoo\n', PASS, b'\nbar\nfoo\n'),
         (
@@ -77,6 +86,12 @@ from pre_commit_hooks.requirements_txt_fixer import Requirement
         ),
         (b'bar\npkg-resources==0.0.0\nfoo\n', FAIL, b'bar\nfoo\n'),
         (b'foo\npkg-resources==0.0.0\nbar\n', FAIL, b'bar\nfoo\n'),
+        (b'foo\npkg-resources==0.0.0\n', FAIL, b'foo\n'),
+        (
+            b'pkg-resources==0.0.0\n#comment\n\nfoo\nbar\n',
+            FAIL,
+            b'bar\n#comment\n\nfoo\n',
+        ),
         (
             b'git+ssh://git_url@tag#egg=ocflib\nDjango\nijk\n',
             FAIL,
@@ -100,6 +115,11 @@ from pre_commit_hooks.requirements_txt_fixer import Requirement
             PASS,
             b'a=2.0.0 \\\n --hash=sha256:abcd\nb==1.0.0\n',
         ),
+        (
+            b'a=2.0.0 \\\n#comment\n --hash=sha256:abcd\nb==1.0.0\n',
+            FAIL,
+            b'#comment\na=2.0.0 \\\n --hash=sha256:abcd\nb==1.0.0\n',
+        ),
     ),
 )
 def test_integration(input_s, expected_retval, output, tmpdir):
@@ -112,6 +132,45 @@ def test_integration(input_s, expected_retval, output, tmpdir):
     assert output_retval == expected_retval
 
 
+def test_fix_requirements_contents():
+    assert fix_requirements_contents(b'a\nb\n') == (PASS, b'a\nb\n')
+    assert fix_requirements_contents(b'b\na') == (FAIL, b'a\nb\n')
+    assert fix_requirements_contents(b'b\na\n', True) == (FAIL, b'a\nb\n')
+
+
+def test_multiple_files(tmpdir, capsys):
+    sorted_path = tmpdir.join('sorted.txt')
+    sorted_path.write_binary(b'a\nb\n')
+    unsorted_path = tmpdir.join('unsorted.txt')
+    unsorted_path.write_binary(b'b\na\n')
+
+    output_retval = main([str(sorted_path), str(unsorted_path)])
+
+    assert output_retval == FAIL
+    assert sorted_path.read_binary() == b'a\nb\n'
+    assert unsorted_path.read_binary() == b'a\nb\n'
+    out, _ = capsys.readouterr()
+    assert out == f'Sorting {unsorted_path}\n'
+
+
+def test_multiple_files_require_version(tmpdir, capsys):
+    path_a = tmpdir.join('a.txt')
+    path_a.write_binary(b'b\na==1\n')
+    path_b = tmpdir.join('b.txt')
+    path_b.write_binary(b'd\nc==1\n')
+
+    output_retval = main([str(path_a), str(path_b), '--require_version'])
+
+    assert output_retval == FAIL
+    out, _ = capsys.readouterr()
+    assert out == (
+        'Missing versions in: b\n'
+        f'Sorting {path_a}\n'
+        'Missing versions in: d\n'
+        f'Sorting {path_b}\n'
+    )
+
+
 def test_require_version(tmpdir: _pytest._py.path.LocalPath) -> None:
     # default: don't require version
     path = tmpdir.join('file.txt')
@@ -174,3 +233,25 @@ def test_requirement_object():
     assert not requirement_bar.has_version()
     assert requirement_baz.has_version()
     assert requirement_baz.version == '1.2.3'
+
+
+@pytest.mark.parametrize(
+    ('value', 'expected'),
+    (
+        (b'foo', None),
+        (b'foo\n', None),
+        (b'foo=1.0\n', None),
+        (b'foo==1.0\n', '1.0'),
+        (b'foo===1.0\n', '1.0'),
+        (b'foo ~= 1.0\n', '1.0'),
+        (b'foo>1\n', '1'),
+        (b'foo==1.0 \n', None),
+        (b'foo @ file:///tmp/foo\n', 'file:///tmp/foo'),
+        (b'foo @ file:///tmp/foo-1.0\n', None),
+        (b'c-a>=1;python_version>="3.6"\n', None),
+    ),
+)
+def test_requirement_extract_version(value, expected):
+    requirement = Requirement()
+    requirement.value = value
+    assert requirement.extract_version() == expected